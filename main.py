@@ -1,10 +1,148 @@
-﻿import shutil
+﻿import multiprocessing
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Iterator
 
 from src.converter import Converter, EConverterType
 from src.utils import Config, Logger
 from pathlib import Path
 from argparse import ArgumentParser, Namespace
 
+_SUPPORTED_SUFFIXES = {".xml", ".kml", ".geojson"}
+
+
+def _find_files(root: Path) -> list[Path]:
+    """Recursively collect XML, KML, and GeoJSON files under root in a single directory walk, sorted by path."""
+    files = []
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:  # missing or unreadable directory
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in _SUPPORTED_SUFFIXES:
+                    files.append(Path(entry.path))
+    return sorted(files)  # scandir order varies by filesystem, and it decides which sibling stem wins
+
+
+def _prefetch(files: list[Path], depth: int = 1) -> Iterator[tuple[Path, bytes]]:
+    """Yield each file with its contents, keeping up to depth reads in flight on background threads.
+
+    A deeper queue keeps the disk busy on directories with many small files, where each read is
+    mostly open/close latency.
+    """
+    depth = max(depth, 1)
+    with ThreadPoolExecutor(max_workers=depth) as reader:
+        pending = deque(reader.submit(file.read_bytes) for file in files[:depth])
+        for index, file in enumerate(files):
+            data = pending.popleft().result()
+            if index + depth < len(files):
+                pending.append(reader.submit(files[index + depth].read_bytes))
+            yield file, data
+
+
+def _output_file(input_file: Path, current_type: EConverterType, convert_type: EConverterType, output_dir: Path,
+                 input_path: Path) -> Path:
+    """Where converting input_file to convert_type writes, the copy of the original if it is already in that format."""
+    # Get relative path from input directory to maintain structure
+    relative_path = input_file.relative_to(input_path)
+    if current_type == convert_type:
+        return output_dir / relative_path
+    return output_dir / relative_path.with_suffix(f".{convert_type.value}")
+
+
+def _group_by_output(files: list[Path], convert_types: list[EConverterType], output_dir: Path, input_path: Path,
+                     copy_original: bool) -> list[list[Path]]:
+    """Group the files that write to any of the same output paths, keeping each group in the files' order.
+
+    Sibling inputs sharing a stem (a.xml, a.kml, a.geojson) write each other's outputs. Each group is converted
+    in order by a single worker, so the last file wins just like in a sequential run, and no two processes ever
+    write the same file.
+    """
+    parent = list(range(len(files)))  # union-find over file indices
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    owners: dict[Path, int] = {}
+    for index, file in enumerate(files):
+        current_type = Converter(file, None, None).current_type  # from the suffix, nothing is read yet
+        for convert_type in convert_types:
+            if convert_type == current_type and not copy_original:
+                continue
+            owner = owners.setdefault(_output_file(file, current_type, convert_type, output_dir, input_path), index)
+            parent[find(index)] = find(owner)
+
+    groups: dict[int, list[Path]] = {}
+    for index, file in enumerate(files):
+        groups.setdefault(find(index), []).append(file)
+    return list(groups.values())
+
+
+def _convert_group(files: list[Path], convert_types: list[EConverterType], output_dir: Path, input_path: Path,
+                   copy_original: bool, pretty: bool) -> list[tuple[str, str | None]]:
+    """Convert and save files one after another in a single worker, see _group_by_output."""
+    results = []
+    for file in files:
+        results.extend(_convert_one(file, convert_types, output_dir, input_path, copy_original, pretty))
+    return results
+
+
+def _convert_one(input_file: Path, convert_types: list[EConverterType], output_dir: Path, input_path: Path,
+                 copy_original: bool, pretty: bool, data: bytes | None = None) -> list[tuple[str, str | None]]:
+    """Convert and save a single file to every target type while maintaining folder structure.
+
+    The file is parsed once and emitted once per target type, from data when its contents were
+    already read. Runs in a worker process, so it builds its own Converter and hands the messages
+    back to the parent to print rather than touching the parent's Logger.
+    """
+    if data is not None:
+        converter = Converter.from_bytes(data, input_file, None, None, pretty)
+    else:
+        converter = Converter(input_file, None, None, pretty)
+
+    # A fused single pass only pays off when the file has just one real conversion to do
+    stream = sum(convert_type != converter.current_type for convert_type in convert_types) == 1
+
+    results = []
+    for convert_type in convert_types:
+        output_file = _output_file(input_file, converter.current_type, convert_type, output_dir, input_path)
+        if converter.current_type == convert_type:  # skip conversion
+            results.append((f"Skipped: {input_file} is already in {convert_type.value} format.", None))
+            if not copy_original:
+                continue
+            # copy to the output folder
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy(input_file, output_file)
+            continue
+
+        # Ensure subdirectories exist in output directory
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # Stream the converted data into a temp file next to the output, only replacing the output once it's
+        # complete, so a file that fails to parse or convert leaves nothing half written behind
+        temp_file = output_file.with_name(f".{output_file.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_file, "wb") as file:
+                converter.write(convert_type, file, stream=stream)
+            os.replace(temp_file, output_file)
+        except BaseException:
+            temp_file.unlink(missing_ok=True)
+            raise
+
+        results.append((f"Saved: {output_file}", "bold green"))
+
+    return results
+
 
 class Main:
     target_types: list[EConverterType]
@@ -14,58 +152,60 @@ class Main:
         self.config: Config = Config(Path("config.ini"))
         self._should_copy_original_to_output = self.config.get("Converter", "copy_original_to_output",
                                                                fallback=True)
+        self._prefetch_depth = self.config.get("Converter", "prefetch_depth", fallback=4)
         self.logger: Logger = Logger(self.config)
 
         self.target_types = []
         self._parse_args(prog_args)
 
     def run(self) -> None:
-        """Run conversion process."""
+        """Run conversion process, spreading the files over a pool of worker processes."""
+        # One job per group of files sharing outputs, usually a single file, so each file is parsed once
+        groups = []
+        if self.jobs > 1:
+            groups = _group_by_output(self.files, self.target_types, self.output_dir, self.input_path,
+                                      self._should_copy_original_to_output)
+
         with self.logger.status("[bold green]Initializing conversion...[/bold green]") as status:
-            for convert_type in self.target_types:
-                for file in self.files:
-                    converter = Converter(file, self.logger, self.config)
+            if len(groups) <= 1:
+                # No point paying for a pool, convert in this process while the next file is read
+                for file, data in _prefetch(self.files, self._prefetch_depth):
                     status.update(f"Processing: {file}")
-                    self._convert_and_save(converter, convert_type)
-                    status.update(f"Converted: {file} to {convert_type.value}")
+                    self._print_results(self._convert_and_save(file, data))
+                    status.update(f"Converted: {file}")
+            else:
+                # Spawned rather than forked, the status refresh and log listener threads are running by now
+                with ProcessPoolExecutor(max_workers=min(self.jobs, len(groups)),
+                                         mp_context=multiprocessing.get_context("spawn")) as executor:
+                    futures = {
+                        executor.submit(_convert_group, group, self.target_types, self.output_dir, self.input_path,
+                                        self._should_copy_original_to_output, self.pretty): group
+                        for group in groups
+                    }
+                    for future in as_completed(futures):
+                        self._print_results(future.result())
+                        status.update(f"Converted: {futures[future][-1]}")
 
             status.update("[bold green]Conversion completed![/bold green]")
 
         status.stop()
 
-    def _convert_and_save(self, converter: Converter, convert_type: EConverterType) -> None:
-        """Convert and save the output file while maintaining folder structure."""
-        converted_data = converter.convert(convert_type)
-
-        # Get relative path from input directory to maintain structure
-        relative_path = converter.input_file.relative_to(self.input_path)
-
-        if converted_data is None:  # skip conversion
-            if not self._should_copy_original_to_output:
-                return
-            # copy to the output folder
-            output_file = self.output_dir / relative_path
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy(converter.input_file, output_file)
-            return
-            # return  # Skip if already in target format
-
-        output_file = self.output_dir / relative_path.with_suffix(f".{convert_type.value}")
-
-        # Ensure subdirectories exist in output directory
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        # Save the converted file
-        with open(output_file, "w", encoding="utf-8") as file:
-            file.write(converted_data)
+    def _convert_and_save(self, file: Path, data: bytes | None = None) -> list[tuple[str, str | None]]:
+        """Convert and save the output files in this process."""
+        return _convert_one(file, self.target_types, self.output_dir, self.input_path,
+                            self._should_copy_original_to_output, self.pretty, data)
 
-        # print(f"Saved: {output_file}")
-        self.logger.print(f"Saved: {output_file}", style="bold green")
+    def _print_results(self, results: list[tuple[str, str | None]]) -> None:
+        """Print the messages returned by a conversion job."""
+        for message, style in results:
+            self.logger.print(message, style=style)
 
     def _parse_args(self, prog_args: Namespace) -> None:
         """Parse command line arguments."""
         self.input_path = Path(prog_args.input)
         self.output_dir = Path(prog_args.output) if prog_args.output else self.input_path.parent
+        self.jobs = getattr(prog_args, "jobs", None) or os.cpu_count() or 1
+        self.pretty = getattr(prog_args, "pretty", False)
 
         if prog_args.xml:
             self.target_types.append(EConverterType.XML)
@@ -78,9 +218,7 @@ class Main:
             raise ValueError("No target type specified. Use --xml, --geojson, or --kml.")
 
         # Recursively search for XML, KML, and GeoJSON files in all subdirectories
-        self.files = list(self.input_path.rglob("*.xml")) + \
-                     list(self.input_path.rglob("*.geojson")) + \
-                     list(self.input_path.rglob("*.kml"))
+        self.files = _find_files(self.input_path)
 
         if not self.files:
             raise ValueError("No valid files found for conversion.")
@@ -93,6 +231,8 @@ if __name__ == '__main__':
     parser.add_argument("-x", "--xml", action="store_true", help="Convert to XML")
     parser.add_argument("-g", "--geojson", action="store_true", help="Convert to GeoJSON")
     parser.add_argument("-k", "--kml", action="store_true", help="Convert to KML")
+    parser.add_argument("-p", "--pretty", action="store_true", help="Indent the output files (compact by default)")
+    parser.add_argument("-j", "--jobs", type=int, help="Number of worker processes (defaults to the CPU count)")
 
     args = parser.parse_args()
     Main(args).run()
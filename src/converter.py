@@ -1,10 +1,22 @@
-﻿import json
+﻿import codecs
+import io
+import json
 import pathlib
 import shutil
 from enum import Enum
-from typing import Any, Dict, List, Tuple, TYPE_CHECKING
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple, TYPE_CHECKING
 import lxml.etree as et
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library json module
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, coordinates are then always parsed one marker at a time
+    np = None
+
 if TYPE_CHECKING:
     from src.utils import Logger, Config
 
@@ -15,203 +27,473 @@ class EConverterType(Enum):
     KML = "kml"
 
 
+_SUFFIX_MAP = {
+    ".xml": EConverterType.XML,
+    ".json": EConverterType.GEOJSON,
+    ".geojson": EConverterType.GEOJSON,
+    ".kml": EConverterType.KML,
+}
+
+# No ID table and no whitespace-only text nodes, neither is used by these formats
+_PARSER_OPTIONS = {"collect_ids": False, "remove_blank_text": True, "huge_tree": True}
+
+# Precompiled KML queries, so the per-placemark loop doesn't re-parse XPath strings
+_KML_NS = {"kml": "http://www.opengis.net/kml/2.2"}
+_KML_PLACEMARK_TAG = f"{{{_KML_NS['kml']}}}Placemark"
+_XP_NAME = et.XPath("kml:name/text()", namespaces=_KML_NS)
+_XP_COORDS = et.XPath(".//kml:coordinates/text()", namespaces=_KML_NS)
+_XP_DATA = et.XPath("kml:ExtendedData/kml:Data", namespaces=_KML_NS)
+_XP_VALUE = et.XPath("kml:value/text()", namespaces=_KML_NS)
+
+# Parser for whole documents, configured like the iterparse loops
+_PARSER = et.XMLParser(**_PARSER_OPTIONS)
+
+# Files with more coordinate strings than this are parsed in a single numpy pass
+_VECTORIZE_THRESHOLD = 1000
+
+# Unparsed inputs larger than this (in bytes) may be converted in one fused pass, see Converter.write
+_STREAM_THRESHOLD = 1 << 20
+
+# The same few tags and keys repeat in every marker, placemark and feature, so lowercase each only once
+_LOWER_CACHE: Dict[str, str] = {}
+
+
+def _lower(key: str) -> str:
+    """Returns key lowercased, memoized in _LOWER_CACHE."""
+    lowered = _LOWER_CACHE.get(key)
+    if lowered is None:
+        lowered = _LOWER_CACHE[key] = key.lower()
+    return lowered
+
+
+def _dumps_compact(obj: Any) -> bytes:
+    """Serializes obj to compact utf-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+# Stylesheets converting between the two XML based formats tree to tree, compiled on first use. XML to
+# KML has none, lowercasing and deduplicating marker tags in XPath 1.0 costs more than building data
+_XSLT_MAP = {
+    (EConverterType.KML, EConverterType.XML): "kml_to_xml.xsl",
+}
+_XSLT_CACHE: Dict[Tuple[EConverterType, EConverterType], et.XSLT] = {}
+_XSLT_NS = "urn:converter"
+
+# Text fields the stylesheets left empty; libxslt drops empty text nodes, the tree emitters keep them
+_XP_EMPTY_FIELDS = et.XPath("/markers/marker/*[not(node())]")
+
+
+def _xslt_strip(_, text: str) -> str:
+    """XSLT extension, str.strip since XPath 1.0 only has normalize-space."""
+    return text.strip()
+
+
+def _xslt_coordinates(_, coord_text: str, separator: str) -> str:
+    """XSLT extension, parses coordinates and writes them back swapped, formatted like the tree emitters."""
+    first, second = Converter._parse_coordinates(coord_text.strip())
+    return "%r%s%r" % (second, separator, first)
+
+
+def _xslt_missing(_, key: str) -> None:
+    """XSLT extension, fails the transform the way a missing required field fails the tree emitters."""
+    raise KeyError(key)
+
+
+def _get_xslt(current_type: EConverterType, new_type: EConverterType) -> et.XSLT:
+    """Returns the compiled stylesheet converting current_type to new_type."""
+    transform = _XSLT_CACHE.get((current_type, new_type))
+    if transform is None:
+        stylesheet = et.parse(pathlib.Path(__file__).with_name(_XSLT_MAP[current_type, new_type]))
+        transform = _XSLT_CACHE[current_type, new_type] = et.XSLT(stylesheet, extensions={
+            (_XSLT_NS, "strip"): _xslt_strip,
+            (_XSLT_NS, "coordinates"): _xslt_coordinates,
+            (_XSLT_NS, "missing"): _xslt_missing,
+        })
+    return transform
+
+
 class Converter:
-    def __init__(self, input_file: str | pathlib.Path, logger: "Logger", config: "Config") -> None:
+    __slots__ = ("_input_file", "_current_type", "_data", "_raw", "_logger", "_config", "_pretty")
+
+    def __init__(self, input_file: str | pathlib.Path, logger: "Logger | None", config: "Config | None",
+                 pretty: bool = False) -> None:
         self._input_file = pathlib.Path(input_file)
-        self._data = self._parse_input_file()
+        self._current_type = _SUFFIX_MAP.get(self._input_file.suffix.lower())
+        if self._current_type is None:
+            raise ValueError("Unsupported file format")
+        self._data: List[Dict[str, Any]] | None = None  # parsed lazily, see data
+        self._raw: bytes | None = None  # input contents when already read into memory, see from_bytes
         self._logger = logger
         self._config = config
+        self._pretty = pretty  # indent the output, otherwise emit it compact
 
-    def _parse_input_file(self):
-        if self._input_file.suffix == ".xml":
-            return self._parse_xml()
-        elif self._input_file.suffix == ".json" or self._input_file.suffix == ".geojson":
-            return self._parse_geojson()
-        elif self._input_file.suffix == ".kml":
-            return self._parse_kml()
-        else:
-            raise ValueError("Unsupported file format")
+    @classmethod
+    def from_bytes(cls, data: bytes, input_file: str | pathlib.Path, logger: "Logger | None",
+                   config: "Config | None", pretty: bool = False) -> "Converter":
+        """Creates a converter over contents that were already read from input_file.
+
+        input_file is still used to detect the format and to report the file, but it is never read.
+        """
+        converter = cls(input_file, logger, config, pretty)
+        converter._raw = data
+        return converter
 
     @property
     def input_file(self) -> pathlib.Path:
         """Returns the input file path."""
         return self._input_file
 
+    @property
+    def current_type(self) -> EConverterType:
+        """Returns the format of the input file, detected from its extension."""
+        return self._current_type
+
     @property
     def data(self) -> List[Dict[str, Any]]:
-        """Returns the parsed data as a list of dictionaries."""
+        """Returns the parsed data as a list of dictionaries, parsing the input file on first access."""
+        if self._data is None:
+            self._data = self._PARSERS[self._current_type](self)
         return self._data
 
     def _parse_xml(self) -> List[Dict[str, Any]]:
         """Parses XML file dynamically, ensuring all metadata fields are preserved."""
-        tree = et.parse(self._input_file)
-        root = tree.getroot()
-        markers = []
+        return self._collect(self._iter_xml())
 
-        for marker in root.findall("marker") + root.findall("item"):  # Handle both <marker> and <item>
+    def _parse_geojson(self) -> List[Dict[str, Any]]:
+        """Parses GeoJSON file dynamically, ensuring all metadata fields are preserved."""
+        return list(self._iter_geojson())
+
+    def _parse_kml(self) -> List[Dict[str, Any]]:
+        """Parses KML file dynamically, ensuring all metadata fields are preserved."""
+        return self._collect(self._iter_kml(), swap=True)
+
+    def _iter_xml(self) -> Iterator[Tuple[Dict[str, Any], str | None]]:
+        """Yields each XML marker as an entry along with its raw <geo> text, if it has one."""
+        found = False
+
+        # Stream the markers so only one of them is held in memory at a time
+        for _, marker in et.iterparse(self._source(), events=("end",), tag=("marker", "item"),
+                                     **_PARSER_OPTIONS):
             entry = {"geo": (0.0, 0.0)}  # Default geo
+            geo_text = None
 
             for child in marker:
-                tag = child.tag.lower()  # Normalize tag names
+                tag = _lower(child.tag)  # Normalize tag names
                 text = child.text.strip() if child.text else ""
 
                 if tag == "geo":
-                    entry["geo"] = self._parse_coordinates(text)  # Handle coordinates separately
+                    geo_text = text  # Handle coordinates separately
                 else:
                     entry[tag] = text  # Store all other metadata dynamically
 
-            markers.append(entry)
+            self._release(marker)
+            found = True
+            yield entry, geo_text
 
-        if not markers:
+        if not found:
             raise ValueError("No valid markers found in the XML file.")
 
-        return markers
-
-    def _parse_geojson(self) -> List[Dict[str, Any]]:
-        """Parses GeoJSON file dynamically, ensuring all metadata fields are preserved."""
-        with open(self._input_file, "r", encoding="utf-8-sig") as f:
-            geojson = json.load(f)
+    def _iter_geojson(self) -> Iterator[Dict[str, Any]]:
+        """Yields each GeoJSON feature as an entry."""
+        raw = self._raw if self._raw is not None else self._input_file.read_bytes()
+        if raw.startswith(codecs.BOM_UTF8):  # orjson rejects a leading BOM
+            raw = raw[len(codecs.BOM_UTF8):]
+        geojson = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
-        markers = []
         for feature in geojson["features"]:
             lon, lat = feature["geometry"]["coordinates"]  # GeoJSON uses [longitude, latitude]
             entry = {"geo": (lat, lon)}  # Store as (latitude, longitude)
 
-            # Copy all properties dynamically
-            for key, value in feature["properties"].items():
-                if value is not None:
-                    entry[key.lower()] = value  # Normalize keys
+            # Copy all properties dynamically, normalizing keys
+            entry.update({_lower(key): value for key, value in feature["properties"].items() if value is not None})
 
-            markers.append(entry)
+            yield entry
 
-        return markers
-
-    def _parse_kml(self) -> List[Dict[str, Any]]:
-        """Parses KML file dynamically, ensuring all metadata fields are preserved."""
-        tree = et.parse(self._input_file)
-        root = tree.getroot()
-        ns = {"kml": "http://www.opengis.net/kml/2.2"}
-
-        markers = []
-        for placemark in root.findall(".//kml:Placemark", ns):
+    def _iter_kml(self) -> Iterator[Tuple[Dict[str, Any], str | None]]:
+        """Yields each KML placemark as an entry along with its raw coordinates text, if it has any."""
+        for _, placemark in et.iterparse(self._source(), events=("end",), tag=_KML_PLACEMARK_TAG,
+                                        **_PARSER_OPTIONS):
             entry = {"geo": (0.0, 0.0)}  # Default geo
 
-            name = placemark.find("kml:name", ns)
-            if name is not None:
-                entry["name"] = name.text.strip()
+            name = _XP_NAME(placemark)
+            if name:
+                entry["name"] = name[0].strip()
 
-            coordinates = placemark.find(".//kml:coordinates", ns)
-            if coordinates is not None:
-                lon, lat = self._parse_coordinates(coordinates.text.strip())
-                entry["geo"] = (lat, lon)  # Swap KML [longitude, latitude] -> (latitude, longitude)
+            coordinates = _XP_COORDS(placemark)
+            coord_text = coordinates[0].strip() if coordinates else None
 
             # Extract ExtendedData fields dynamically
-            extended_data = placemark.find("kml:ExtendedData", ns)
-            if extended_data is not None:
-                for data in extended_data.findall("kml:Data", ns):
-                    key = data.get("name")
-                    value = data.find("kml:value", ns)
-                    if key and value is not None:
-                        entry[key.lower()] = value.text.strip()  # Normalize keys
-
-            markers.append(entry)
-
-        return markers
+            for data in _XP_DATA(placemark):
+                key = data.get("name")
+                value = _XP_VALUE(data)
+                if key and value:
+                    entry[_lower(key)] = value[0].strip()  # Normalize keys
+
+            self._release(placemark)
+            yield entry, coord_text
+
+    def _collect(self, markers: Iterable[Tuple[Dict[str, Any], str | None]],
+                 swap: bool = False) -> List[Dict[str, Any]]:
+        """Builds the data list from (entry, coordinate text) pairs, parsing all coordinates in one batch.
+
+        swap flips KML's [longitude, latitude] order into (latitude, longitude).
+        """
+        entries = []
+        located, coord_texts = [], []  # entries with coordinates and their raw text
+        for entry, coord_text in markers:
+            entries.append(entry)
+            if coord_text is not None:
+                located.append(entry)
+                coord_texts.append(coord_text)
+
+        for entry, (first, second) in zip(located, self._parse_coordinate_batch(coord_texts)):
+            entry["geo"] = (second, first) if swap else (first, second)
+
+        return entries
+
+    def _stream(self) -> Iterator[Dict[str, Any]]:
+        """Yields entries one at a time straight from the input file, without ever building data."""
+        if self._current_type == EConverterType.GEOJSON:
+            yield from self._iter_geojson()
+            return
+
+        swap = self._current_type == EConverterType.KML
+        for entry, coord_text in self._iter_kml() if swap else self._iter_xml():
+            if coord_text is not None:
+                first, second = self._parse_coordinates(coord_text)
+                entry["geo"] = (second, first) if swap else (first, second)
+            yield entry
 
     def convert(self, new_type: EConverterType) -> str | None:
         """Converts the current data to the requested format. Returns None if conversion is unnecessary."""
-        current_type = None
-        if self._input_file.suffix == ".xml":
-            current_type = EConverterType.XML
-        elif self._input_file.suffix == ".json" or self._input_file.suffix == ".geojson":
-            current_type = EConverterType.GEOJSON
-        elif self._input_file.suffix == ".kml":
-            current_type = EConverterType.KML
-
         # Skip conversion if already in the requested format
-        if current_type == new_type:
-            self._logger.print(f"Skipped: {self.input_file} is already in {new_type.value} format.")
+        if self._current_type == new_type:
+            if self._logger is not None:  # worker processes run without a logger
+                self._logger.print(f"Skipped: {self.input_file} is already in {new_type.value} format.")
             return None
 
-        # Perform the conversion
-        if new_type == EConverterType.GEOJSON:
-            return self._to_geojson()
-        elif new_type == EConverterType.XML:
-            return self._to_xml()
-        elif new_type == EConverterType.KML:
-            return self._to_kml()
-        else:
+        return self._emit(new_type)
+
+    def write(self, new_type: EConverterType, out: BinaryIO, stream: bool = False) -> None:
+        """Converts the current data and writes it straight to a file opened in binary mode.
+
+        Unlike convert, this never builds the serialized document as a string. Callers are
+        expected to check current_type themselves before opening the output file.
+
+        With stream, an input that hasn't been parsed yet is converted without building data at
+        all: a large one in a single pass, each entry written out as soon as it is read, and KML
+        to XML tree to tree with XSLT. Since that re-reads the input on every call, only ask for
+        it when this is the file's only conversion.
+        """
+        self._emit(new_type, out, stream)
+
+    def _emit(self, new_type: EConverterType, out: BinaryIO | None = None, stream: bool = False) -> str | None:
+        """Serializes the data to new_type, writing to out if given, otherwise returning a string."""
+        emitter = self._EMITTERS.get(new_type)
+        if emitter is None:
             raise ValueError("Unsupported conversion type")
+        if stream and self._can_stream(out):
+            return self._STREAMERS[new_type](self, out)
+        if stream and self._data is None and (self._current_type, new_type) in _XSLT_MAP:
+            return self._transform(new_type, out)
+        return emitter(self, out)
+
+    def _can_stream(self, out: BinaryIO | None) -> bool:
+        """Whether a fused single-pass conversion pays off over building data first.
+
+        Streamed output is always compact, so pretty output keeps using the tree based emitters.
+        """
+        if out is None or self._data is not None or self._pretty:
+            return False
+        size = len(self._raw) if self._raw is not None else self._input_file.stat().st_size
+        return size > _STREAM_THRESHOLD
+
+    def _transform(self, new_type: EConverterType, out: BinaryIO | None) -> str | None:
+        """Converts between the XML based formats tree to tree with XSLT, without building data."""
+        result = _get_xslt(self._current_type, new_type)(et.parse(self._source(), _PARSER))
+        root = result.getroot()
+
+        for field in _XP_EMPTY_FIELDS(root):
+            field.text = ""  # serialize as <adr></adr> rather than <adr/>
+
+        return self._write_tree(root, out)
 
-    def _to_geojson(self) -> str:
+    def _to_geojson(self, out: BinaryIO | None = None) -> str | None:
         """Converts data to GeoJSON format."""
-        features = []
-        for entry in self._data:
-            lat, lon = entry["geo"]
-            properties = {key: value for key, value in entry.items() if key not in ["geo"]}
-
-            # Ensure 'adr' is correctly renamed to 'address' in GeoJSON
-            if "adr" in properties:
-                properties["address"] = properties.pop("adr")
-
-            feature = {
-                "type": "Feature",
-                "properties": properties,
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [lon, lat],  # GeoJSON uses [longitude, latitude]
-                },
-            }
-            features.append(feature)
+        features = [self._geojson_feature(entry) for entry in self.data]
 
         geojson = {"type": "FeatureCollection", "features": features}
-        return json.dumps(geojson, indent=2)
+        if orjson is not None:
+            dumped = orjson.dumps(geojson, option=orjson.OPT_INDENT_2 if self._pretty else 0)  # already utf-8 bytes
+            if out is None:
+                return dumped.decode("utf-8")
+            out.write(dumped)
+            return None
+
+        options = {"indent": 2} if self._pretty else {"separators": (",", ":")}
+        if out is None:
+            return json.dumps(geojson, **options)
+        json.dump(geojson, codecs.getwriter("utf-8")(out), **options)
 
-    def _to_xml(self) -> str:
+    def _to_xml(self, out: BinaryIO | None = None) -> str | None:
         """Converts data to XML format using lxml.etree."""
         root = et.Element("markers")
-        for entry in self._data:
-            marker = et.SubElement(root, "marker")
-            et.SubElement(marker, "name").text = entry["name"]
-            et.SubElement(marker, "adr").text = entry.get("address", "")
-            lat, lon = entry["geo"]
-            et.SubElement(marker, "geo").text = f"{lat}, {lon}"  # Keep (latitude, longitude)
-            et.SubElement(marker, "note").text = entry.get("note", "")
+        for entry in self.data:
+            root.append(self._xml_marker(entry))
 
-        return et.tostring(root, encoding="utf-8", xml_declaration=True, pretty_print=True).decode("utf-8")
+        return self._write_tree(root, out)
 
-    def _to_kml(self) -> str:
+    def _to_kml(self, out: BinaryIO | None = None) -> str | None:
         """Converts data to KML format, preserving all metadata."""
-        kml = et.Element("kml", xmlns="http://www.opengis.net/kml/2.2")
+        kml = et.Element("kml", xmlns=_KML_NS["kml"])
         doc = et.SubElement(kml, "Document")
 
-        for entry in self._data:
-            placemark = et.SubElement(doc, "Placemark")
-            et.SubElement(placemark, "name").text = entry["name"]
+        for entry in self.data:
+            doc.append(self._kml_placemark(entry))
+
+        return self._write_tree(kml, out)
+
+    def _stream_geojson(self, out: BinaryIO) -> None:
+        """Fused conversion to GeoJSON, writing each feature as soon as its entry is read."""
+        out.write(b'{"type":"FeatureCollection","features":[')
+        separator = b""
+        for entry in self._stream():
+            out.write(separator)
+            out.write(_dumps_compact(self._geojson_feature(entry)))
+            separator = b","
+        out.write(b"]}")
+
+    def _stream_xml(self, out: BinaryIO) -> None:
+        """Fused conversion to XML, writing each marker as soon as its entry is read."""
+        with et.xmlfile(out, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            with xf.element("markers"):
+                for entry in self._stream():
+                    xf.write(self._xml_marker(entry))
+
+    def _stream_kml(self, out: BinaryIO) -> None:
+        """Fused conversion to KML, writing each placemark as soon as its entry is read."""
+        with et.xmlfile(out, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            with xf.element("kml", xmlns=_KML_NS["kml"]), xf.element("Document"):
+                for entry in self._stream():
+                    xf.write(self._kml_placemark(entry))
+
+    @staticmethod
+    def _geojson_feature(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Builds the GeoJSON feature for one entry."""
+        lat, lon = entry["geo"]
+        properties = {key: value for key, value in entry.items() if key not in ["geo"]}
+
+        # Ensure 'adr' is correctly renamed to 'address' in GeoJSON
+        if "adr" in properties:
+            properties["address"] = properties.pop("adr")
+
+        return {
+            "type": "Feature",
+            "properties": properties,
+            "geometry": {
+                "type": "Point",
+                "coordinates": [lon, lat],  # GeoJSON uses [longitude, latitude]
+            },
+        }
 
-            # Add extended metadata
-            extended_data = et.SubElement(placemark, "ExtendedData")
-            for key, value in entry.items():
-                if key not in ["name", "geo"] and value:  # Skip name and geo
-                    data_element = et.SubElement(extended_data, "Data", name=key)
-                    et.SubElement(data_element, "value").text = str(value)
+    @staticmethod
+    def _xml_marker(entry: Dict[str, Any]) -> et._Element:
+        """Builds the <marker> element for one entry."""
+        marker = et.Element("marker")
+        et.SubElement(marker, "name").text = entry["name"]
+        et.SubElement(marker, "adr").text = entry.get("address", "")
+        et.SubElement(marker, "geo").text = "%r, %r" % entry["geo"]  # Keep (latitude, longitude)
+        et.SubElement(marker, "note").text = entry.get("note", "")
+        return marker
 
-            # Add coordinates
-            point = et.SubElement(placemark, "Point")
-            lat, lon = entry["geo"]
-            et.SubElement(point, "coordinates").text = f"{lon},{lat}"
+    @staticmethod
+    def _kml_placemark(entry: Dict[str, Any]) -> et._Element:
+        """Builds the <Placemark> element for one entry."""
+        placemark = et.Element("Placemark")
+        et.SubElement(placemark, "name").text = entry["name"]
+
+        # Add extended metadata
+        extended_data = et.SubElement(placemark, "ExtendedData")
+        for key, value in entry.items():
+            if key not in ["name", "geo"] and value:  # Skip name and geo
+                data_element = extended_data.makeelement("Data", {"name": key})
+                extended_data.append(data_element)
+                et.SubElement(data_element, "value").text = str(value)
+
+        # Add coordinates
+        point = et.SubElement(placemark, "Point")
+        lat, lon = entry["geo"]
+        et.SubElement(point, "coordinates").text = "%r,%r" % (lon, lat)
+        return placemark
+
+    def _write_tree(self, root: et._Element, out: BinaryIO | None) -> str | None:
+        """Serializes an element tree, streaming it through lxml's serializer when out is given."""
+        if out is None:
+            return et.tostring(root, encoding="utf-8", xml_declaration=True,
+                               pretty_print=self._pretty).decode("utf-8")
+        et.ElementTree(root).write(out, encoding="utf-8", xml_declaration=True, pretty_print=self._pretty)
+
+    def _source(self) -> pathlib.Path | io.BytesIO:
+        """Returns something lxml can parse the input from, preferring contents already in memory."""
+        return io.BytesIO(self._raw) if self._raw is not None else self._input_file
 
-        return et.tostring(kml, encoding="utf-8", xml_declaration=True, pretty_print=True).decode("utf-8")
+    @staticmethod
+    def _release(elem: et._Element) -> None:
+        """Frees a fully processed element and its already processed siblings during iterparse."""
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+    @classmethod
+    def _parse_coordinate_batch(cls, coord_texts: List[str]) -> List[Tuple[float, float]]:
+        """Parses many coordinate strings at once, using numpy's C parser for large files."""
+        if np is not None and len(coord_texts) > _VECTORIZE_THRESHOLD:
+            joined = "\n".join(text or "0,0" for text in coord_texts)  # empty coordinates default to (0, 0)
+            if joined.count("\n") == len(coord_texts) - 1:  # one row per coordinate string
+                try:
+                    # No comment character, "#" must fail like it does in the per-marker parser
+                    coords = np.loadtxt(io.StringIO(joined), delimiter=",", usecols=(0, 1), ndmin=2,
+                                        comments=None)
+                except ValueError:
+                    pass  # let the per-marker parser report the offending string
+                else:
+                    if len(coords) == len(coord_texts):  # a skipped row would shift every later marker
+                        return [tuple(row) for row in coords.tolist()]
+        return [cls._parse_coordinates(text) for text in coord_texts]
 
     @staticmethod
     def _parse_coordinates(coord_text: str) -> Tuple[float, float]:
         """Parses coordinate string and ensures correct order."""
-        if coord_text == "" or coord_text is None:
+        if not coord_text:
             return 0.0, 0.0
+        # Scan for the first two comma separated fields without splitting the whole string into a list
+        head, comma, tail = coord_text.partition(",")
         try:
-            coords = [float(c) for c in coord_text.split(",")[:2]]
+            first = float(head)
+            second = float(tail.partition(",")[0]) if comma else None
         except ValueError:
             raise ValueError(f"Invalid coordinate format: {coord_text}")
-        if len(coords) < 2:
+        if second is None:
             raise ValueError(f"Invalid coordinates: {coord_text}")
-        return coords[0], coords[1]
+        return first, second
+
+    # Dispatch tables keyed by format, resolved once per class instead of per call
+    _PARSERS = {
+        EConverterType.XML: _parse_xml,
+        EConverterType.GEOJSON: _parse_geojson,
+        EConverterType.KML: _parse_kml,
+    }
+    _EMITTERS = {
+        EConverterType.XML: _to_xml,
+        EConverterType.GEOJSON: _to_geojson,
+        EConverterType.KML: _to_kml,
+    }
+    _STREAMERS = {
+        EConverterType.XML: _stream_xml,
+        EConverterType.GEOJSON: _stream_geojson,
+        EConverterType.KML: _stream_kml,
+    }
@@ -0,0 +1,59 @@
+<?xml version="1.0" encoding="utf-8"?>
+<!-- Converts a KML document straight into an XML marker list, field for field like Converter._to_xml -->
+<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform"
+                xmlns:kml="http://www.opengis.net/kml/2.2" xmlns:cv="urn:converter"
+                exclude-result-prefixes="kml cv">
+    <xsl:variable name="upper" select="'ABCDEFGHIJKLMNOPQRSTUVWXYZ'"/>
+    <xsl:variable name="lower" select="'abcdefghijklmnopqrstuvwxyz'"/>
+
+    <xsl:template match="/">
+        <markers>
+            <xsl:apply-templates select="//kml:Placemark"/>
+        </markers>
+    </xsl:template>
+
+    <xsl:template match="kml:Placemark">
+        <!-- ExtendedData fields with a key and a value, a later one overriding an earlier one -->
+        <xsl:variable name="data" select="kml:ExtendedData/kml:Data[@name != ''][kml:value/text()]"/>
+
+        <marker>
+            <name>
+                <xsl:choose>
+                    <xsl:when test="$data[translate(@name, $upper, $lower) = 'name']">
+                        <xsl:call-template name="field">
+                            <xsl:with-param name="data" select="$data"/>
+                            <xsl:with-param name="key" select="'name'"/>
+                        </xsl:call-template>
+                    </xsl:when>
+                    <xsl:when test="kml:name/text()">
+                        <xsl:value-of select="cv:strip(string(kml:name/text()))"/>
+                    </xsl:when>
+                    <xsl:otherwise>
+                        <xsl:value-of select="cv:missing('name')"/>
+                    </xsl:otherwise>
+                </xsl:choose>
+            </name>
+            <adr>
+                <xsl:call-template name="field">
+                    <xsl:with-param name="data" select="$data"/>
+                    <xsl:with-param name="key" select="'address'"/>
+                </xsl:call-template>
+            </adr>
+            <geo>
+                <xsl:value-of select="cv:coordinates(string(.//kml:coordinates/text()), ', ')"/>
+            </geo>
+            <note>
+                <xsl:call-template name="field">
+                    <xsl:with-param name="data" select="$data"/>
+                    <xsl:with-param name="key" select="'note'"/>
+                </xsl:call-template>
+            </note>
+        </marker>
+    </xsl:template>
+
+    <xsl:template name="field">
+        <xsl:param name="data"/>
+        <xsl:param name="key"/>
+        <xsl:value-of select="cv:strip(string($data[translate(@name, $upper, $lower) = $key][last()]/kml:value/text()))"/>
+    </xsl:template>
+</xsl:stylesheet>
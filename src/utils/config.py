@@ -1,5 +1,5 @@
 ﻿from configparser import ConfigParser
-from typing import Any
+from typing import Any, Dict
 from pathlib import Path
 
 DEFAULT_CONFIG = {
@@ -9,21 +9,54 @@ DEFAULT_CONFIG = {
 }
 
 
+def _coerce(value: str) -> Any:
+    """Convert an INI string to a bool, int or float when it looks like one."""
+    lowered = value.lower()
+    if lowered in ("true", "yes", "on"):
+        return True
+    if lowered in ("false", "no", "off"):
+        return False
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
 class Config:
     def __init__(self, config_file: Path):
         self.config = ConfigParser()
         self._validate_config(config_file)
         self.config.read(config_file)
+        # Read every value once up front, so get() is a plain dict lookup returning typed values. Values
+        # using % interpolation are left out and resolved on lookup, so a bad one only fails when it's read
+        self._cache: Dict[str, Dict[str, Any]] = {
+            section: {option: _coerce(value) for option, value in self.config.items(section, raw=True)
+                      if "%" not in value}
+            for section in self.config.sections()
+        }
 
-    def get(self, section: str, option: str, fallback: Any = None) -> str:
-        """Get a configuration value."""
-        return self.config.get(section, option, fallback=fallback)
+    def get(self, section: str, option: str, fallback: Any = None) -> Any:
+        """Get a configuration value, converted to a bool, int or float where possible."""
+        option = self.config.optionxform(option)
+        values = self._cache.get(section, {})
+        if option in values:
+            return values[option]
+        if self.config.has_option(section, option):  # interpolated, see __init__
+            return _coerce(self.config.get(section, option))
+        return fallback
 
     def set(self, section: str, option: str, value: str):
         """Set a configuration value."""
         if not self.config.has_section(section):
             self.config.add_section(section)
         self.config.set(section, option, value)
+        values = self._cache.setdefault(section, {})
+        if "%" in value:
+            values.pop(self.config.optionxform(option), None)
+        else:
+            values[self.config.optionxform(option)] = _coerce(value)
 
     def save(self, config_file: str):
         """Save the configuration to a file."""
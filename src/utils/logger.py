@@ -1,93 +1,196 @@
-﻿import enum
+﻿import atexit
+import copy
+import functools
 import logging
+import queue
 import random
-from typing import Optional, Union, Any
-
-import rich.status
-from rich.highlighter import JSONHighlighter
-from rich.logging import RichHandler
-from rich.console import Console, RenderableType, JustifyMethod, OverflowMethod
-from rich.progress import ProgressColumn, GetTimeCallable
-from rich.style import Style
-from rich import pretty, progress
-# noinspection PyProtectedMember
-from rich._spinners import SPINNERS
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Union, Any
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from rich.console import RenderableType
+    from rich.highlighter import JSONHighlighter
+    from rich.progress import Progress, ProgressColumn
+    from rich.status import Status
     from src.utils.config import Config
 
+# Styles for Logger.print, as style strings so rich only parses the ones actually printed
+PRINT_STYLES = {
+    "info": "blue",
+    "success": "green",
+    "warning": "yellow",
+    "error": "red",
+    "critical": "bold red",
+    "debug": "cyan",
+}
+
+_LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+
+@functools.cache
+def _get_log_level(log_level: Any) -> int:
+    """Convert a log level name to a logging level, falling back to INFO for anything else."""
+    if log_level == "INFO":  # the default, and what nearly every config uses
+        return logging.INFO
+    # Config hands back numbers as ints, so don't assume a str
+    return _LOG_LEVELS.get(str(log_level).upper(), logging.INFO)
+
+
+@functools.cache
+def _json_highlighter() -> "JSONHighlighter":
+    """Returns the highlighter shared by every Logger's console."""
+    from rich.highlighter import JSONHighlighter
+    return JSONHighlighter()
+
+
+@functools.cache
+def _spinner_names() -> tuple[str, ...]:
+    """Returns the names of all of rich's spinners."""
+    # noinspection PyProtectedMember
+    from rich._spinners import SPINNERS
+    return tuple(SPINNERS)
+
+
+class _LocalQueueHandler(QueueHandler):
+    """Queues records for a listener in this process, keeping exc_info so RichHandler still renders tracebacks."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Format the message now, the args may have changed by the time the listener renders it
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _FlushableQueueListener(QueueListener):
+    """QueueListener that can wait until every record queued so far has been rendered."""
+
+    def flush(self) -> None:
+        done = threading.Event()
+        self.queue.put_nowait(done)
+        done.wait()
+
+    def handle(self, record: "logging.LogRecord | threading.Event") -> None:
+        if isinstance(record, threading.Event):  # queued by flush, everything before it is rendered
+            record.set()
+            return
+        super().handle(record)
+
+
+# The running listener per logger name. A new Logger for the same name stops the previous one's listener
+_LISTENERS: Dict[str, _FlushableQueueListener] = {}
+
+
+def _stop_listeners() -> None:
+    """Renders any queued records and stops every background logging thread."""
+    while _LISTENERS:
+        _LISTENERS.popitem()[1].stop()
+
+
+atexit.register(_stop_listeners)
+
 
 class Logger:
+    __slots__ = ("_initialized", "_console", "_refresh_hz", "_show_locals", "_logger", "_handler",
+                 "_queue_handler", "_listener", "info", "success", "warning", "error", "debug", "critical")
+
     def __init__(self, config: "Config"):
+        from rich.console import Console
+
         self._initialized = False
 
         self._console = Console(
             color_system="auto",
             log_path=True,
             log_time_format="[%X]",
-            highlighter=JSONHighlighter()
+            highlighter=_json_highlighter()
         )
 
+        # Redrawing is the main cost of a progress bar, a couple of times a second is plenty for batch runs
+        self._refresh_hz = config.get("GENERAL", "progress_refresh_hz", fallback=2)
+
+        # Dumping every frame's locals is expensive with whole element trees in scope, so it's opt-in
+        self._show_locals = config.get("GENERAL", "debug_locals", fallback=False)
+
         log_level_str = config.get("GENERAL", "log_level", fallback="INFO")
-        log_level = self._get_log_level(log_level_str)
-        with self._console.status("[bold green]Initializing logger...[/bold green]"):
-            self._init_logger("BatchConverter", log_level)
+        log_level = _get_log_level(log_level_str)
+        self._init_logger("BatchConverter", log_level)
 
     def _init_logger(self, name, log_level):
+        from rich.highlighter import NullHighlighter
+        from rich.logging import RichHandler
+
         self._logger = logging.getLogger(name)
         self._logger.setLevel(log_level)
         self._logger.propagate = False
 
+        # Bound straight to the stdlib methods, which skip disabled levels themselves, so there's no proxy frame
+        self.info = self.success = self._logger.info
+        self.warning = self._logger.warning
+        self.error = self._logger.error
+        self.debug = self._logger.debug
+        self.critical = self._logger.critical
+
         self._handler = RichHandler(
+            console=self._console,
             show_time=False,
             show_path=False,
-            markup=True,
+            markup=False,  # log messages are plain text, don't scan them for markup or highlights
+            highlighter=NullHighlighter(),
             rich_tracebacks=True,
-            tracebacks_show_locals=True,
-        )
-        self._formatter = logging.Formatter(
-            "%(name)s - %(levelname)s - %(message)s"
+            tracebacks_show_locals=self._show_locals,
         )
-        self._handler.setFormatter(self._formatter)
-        self._logger.addHandler(self._handler)
+
+        # Records are rendered by RichHandler on a background thread, logging calls only enqueue them.
+        # Console output from this class flushes the queue first, so it never overtakes earlier records
+        self._queue_handler = _LocalQueueHandler(queue.SimpleQueue())
+        self._listener = _FlushableQueueListener(self._queue_handler.queue, self._handler,
+                                                 respect_handler_level=True)
+        for handler in self._logger.handlers[:]:  # from an earlier Logger for the same name
+            self._logger.removeHandler(handler)
+        previous = _LISTENERS.pop(name, None)
+        if previous is not None:
+            previous.stop()  # renders what the earlier Logger still had queued
+        self._logger.addHandler(self._queue_handler)
+        self._listener.start()
+        _LISTENERS[name] = self._listener
         self._initialized = True
 
-    @staticmethod
-    def _get_log_level(log_level_str: str) -> int:
-        """Convert log level string to logging level."""
-        log_levels = {
-            "DEBUG": logging.DEBUG,
-            "INFO": logging.INFO,
-            "WARNING": logging.WARNING,
-            "ERROR": logging.ERROR,
-            "CRITICAL": logging.CRITICAL,
-        }
-        return log_levels.get(log_level_str.upper(), logging.INFO)
+    def shutdown(self) -> None:
+        """Renders any queued records and stops the background logging thread, later records render inline."""
+        if _LISTENERS.get(self._logger.name) is self._listener:
+            _LISTENERS.pop(self._logger.name).stop()
+            self._logger.removeHandler(self._queue_handler)
+            self._logger.addHandler(self._handler)
 
-    @staticmethod
-    def track(*args, **kwargs):
+    def _flush(self) -> None:
+        """Waits until every record logged so far has been rendered."""
+        listener = _LISTENERS.get(self._logger.name)
+        if listener is not None:
+            listener.flush()
+
+    def track(self, *args, **kwargs):
+        from rich import progress
+        kwargs.setdefault("console", self._console)
+        kwargs.setdefault("refresh_per_second", self._refresh_hz)
         return progress.track(*args, **kwargs)
 
-    @staticmethod
-    def progress(*columns: Union[str, ProgressColumn],
-                 console: Optional[Console] = None,
-                 auto_refresh: bool = True,
-                 refresh_per_second: float = 10,
-                 speed_estimate_period: float = 30.0,
-                 transient: bool = False,
-                 redirect_stdout: bool = True,
-                 redirect_stderr: bool = True,
-                 get_time: Optional[GetTimeCallable] = None,
-                 disable: bool = False,
-                 expand: bool = False) -> progress.Progress:
-        """Renders an auto-updating progress bar(s).
+    def progress(self, *columns: Union[str, "ProgressColumn"], **kwargs: Any) -> "Progress":
+        """Renders an auto-updating progress bar(s). Keyword arguments are passed on to `rich.progress.Progress`.
 
         Args:
-            console (Console, optional): Optional Console instance. Defaults to an internal Console instance writing to stdout.
+            console (Console, optional): Optional Console instance. Defaults to the logger's console.
             auto_refresh (bool, optional): Enable auto refresh. If disabled, you will need to call `refresh()`.
-            refresh_per_second (Optional[float], optional): Number of times per second to refresh the progress information or None to use default (10). Defaults to None.
+            refresh_per_second (Optional[float], optional): Number of times per second to refresh the progress information. Defaults to progress_refresh_hz from the config.
             speed_estimate_period: (float, optional): Period (in seconds) used to calculate the speed estimate. Defaults to 30.
             transient: (bool, optional): Clear the progress on exit. Defaults to False.
             redirect_stdout: (bool, optional): Enable redirection of stdout, so ``print`` may be used. Defaults to True.
@@ -96,21 +199,12 @@ class Logger:
             disable (bool, optional): Disable progress display. Defaults to False
             expand (bool, optional): Expand tasks table to fit width. Defaults to False.
         """
-        return progress.Progress(
-            *columns,
-            console=console,
-            auto_refresh=auto_refresh,
-            refresh_per_second=refresh_per_second,
-            speed_estimate_period=speed_estimate_period,
-            transient=transient,
-            redirect_stdout=redirect_stdout,
-            redirect_stderr=redirect_stderr,
-            get_time=get_time,
-            disable=disable,
-            expand=expand,
-        )
+        from rich import progress
+        kwargs.setdefault("console", self._console)
+        kwargs.setdefault("refresh_per_second", self._refresh_hz)
+        return progress.Progress(*columns, **kwargs)
 
-    def status(self, status: RenderableType, use_random_spinner=False, **kwargs) -> rich.status.Status:
+    def status(self, status: "RenderableType", use_random_spinner=False, **kwargs) -> "Status":
         """Display a status and spinner. See `rich.console.Console.status` for details.
         Args:
             status (RenderableType): A status renderable (str or Text typically).
@@ -122,81 +216,43 @@ class Logger:
         if use_random_spinner:
             spinner = self._get_random_spinner()
             kwargs["spinner"] = spinner
+        else:
+            kwargs.setdefault("refresh_per_second", 4)  # the default dots spinner still reads fine at 4 frames
+        self._flush()
         return self._console.status(status, **kwargs)
 
-    def print(
-            self,
-            *objects: Any,
-            sep: str = " ",
-            end: str = "\n",
-            style: Optional[Union[str, Style]] = None,
-            justify: Optional[JustifyMethod] = None,
-            overflow: Optional[OverflowMethod] = None,
-            no_wrap: Optional[bool] = None,
-            emoji: Optional[bool] = None,
-            markup: Optional[bool] = None,
-            highlight: Optional[bool] = None,
-            width: Optional[int] = None,
-            height: Optional[int] = None,
-            crop: bool = True,
-            soft_wrap: Optional[bool] = None,
-            new_line_start: bool = False, ):
-        self._console.print(
-            *objects,
-            sep=sep,
-            end=end,
-            style=style,
-            justify=justify,
-            overflow=overflow,
-            no_wrap=no_wrap,
-            emoji=emoji,
-            markup=markup,
-            highlight=highlight,
-            width=width,
-            height=height,
-            crop=crop,
-            soft_wrap=soft_wrap,
-            new_line_start=new_line_start
-        )
+    def print(self, *objects: Any, **kwargs: Any) -> None:
+        """Prints to the console. Keyword arguments are passed on to `rich.console.Console.print`."""
+        self._flush()
+        self._console.print(*objects, **kwargs)
 
     def print_json(self, json, **kwargs: object) -> None:
+        """Pretty-prints a JSON string, or an object, which rich then serializes in a single pass."""
+        if json is not None and not isinstance(json, str):
+            json, kwargs["data"] = None, json
+        self._flush()
         self._console.print_json(json, indent=4, **kwargs)
 
     @staticmethod
     def pprint(obj):
+        from rich import pretty
         pretty.pprint(obj)
 
     def print_exception(self, exc):
+        self._flush()
         self._console.print_exception()
         self._logger.error(exc)
 
-    def info(self, msg):
-        self._logger.info(msg)
-
-    def success(self, msg):
-        self._logger.info(msg)
-
-    def warning(self, msg):
-        self._logger.warning(msg)
-
-    def error(self, msg):
-        self._logger.error(msg)
-
-    def debug(self, msg):
-        self._logger.debug(msg)
+    def debug_exception(self, exc):
+        """Like print_exception, but also shows the local variables of every frame."""
+        self._flush()
+        self._console.print_exception(show_locals=True)
+        self._logger.error(exc)
 
-    def critical(self, msg):
-        self._logger.critical(msg)
+    def is_enabled(self, level: int) -> bool:
+        """Whether messages at level are logged, so callers can skip building expensive ones."""
+        return self._logger.isEnabledFor(level)  # the stdlib logger is shared, so its level may change later
 
     @staticmethod
     def _get_random_spinner():
-        random_index = random.randint(0, len(SPINNERS) - 1)
-        return list(SPINNERS.keys())[random_index]
-
-    class EPrintStyle(enum.Enum):
-        INFO = Style(color="blue")
-        SUCCESS = Style(color="green")
-        WARNING = Style(color="yellow")
-        ERROR = Style(color="red")
-        CRITICAL = Style(color="red", bold=True)
-        DEBUG = Style(color="cyan")
+        return random.choice(_spinner_names())
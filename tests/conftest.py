@@ -0,0 +1,39 @@
+﻿import pytest
+from pathlib import Path
+from src.converter import Converter
+from tests.helpers import load_test_file
+
+_TESTS_DIR = Path(__file__).resolve().parent
+
+
+@pytest.fixture(scope="session")
+def config():
+    """Fixture to create a config instance."""
+    from src.utils import Config
+    return Config(_TESTS_DIR.parent / "config.ini")
+
+
+@pytest.fixture(scope="session")
+def logger(config):
+    """Fixture to create a logger instance."""
+    from src.utils import Logger
+    return Logger(config)
+
+
+# The converters only ever read their data, so each sample file is parsed once per session
+@pytest.fixture(scope="session")
+def xml_converter(logger, config):
+    """Fixture to create a Converter instance for XML."""
+    return Converter(load_test_file("test.xml"), logger, config)
+
+
+@pytest.fixture(scope="session")
+def geojson_converter(logger, config):
+    """Fixture to create a Converter instance for GeoJSON."""
+    return Converter(load_test_file("test.geojson"), logger, config)
+
+
+@pytest.fixture(scope="session")
+def kml_converter(logger, config):
+    """Fixture to create a Converter instance for KML."""
+    return Converter(load_test_file("test.kml"), logger, config)
@@ -0,0 +1,28 @@
+﻿import json
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, as it is for the converter
+    orjson = None
+
+_TEST_FILES = Path(__file__).resolve().parent / "test_files"
+
+
+# helper function to load test files
+def load_test_file(file_name: str) -> Path:
+    """Return the path of a sample file in test_files."""
+    return _TEST_FILES / file_name
+
+
+def load_json(data: str | bytes) -> Any:
+    """Parse JSON, with orjson when it is installed."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def dump_json(obj: Any) -> bytes:
+    """Serialize obj to compact utf-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,48 @@
+﻿import pytest
+from configparser import InterpolationSyntaxError
+from src.utils import Config
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Creates a config file with a value of each supported type."""
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[GENERAL]\n"
+                           "log_level = INFO\n"
+                           "\n"
+                           "[Converter]\n"
+                           "copy_original_to_output = False\n"
+                           "prefetch_depth = 4\n")
+    return config_file
+
+
+def test_get_coerces_values(config_file):
+    """Test that values are returned as bool, int or str rather than raw strings."""
+    config = Config(config_file)
+    assert config.get("Converter", "copy_original_to_output") is False
+    assert config.get("Converter", "prefetch_depth") == 4
+    assert config.get("GENERAL", "log_level") == "INFO"
+
+
+def test_get_fallback_and_set(config_file):
+    """Test that missing options use the fallback and that set values are visible to get."""
+    config = Config(config_file)
+    assert config.get("Converter", "missing", fallback=True) is True
+    assert config.get("Missing", "option", fallback="x") == "x"
+
+    config.set("Converter", "Prefetch_Depth", "8")
+    assert config.get("Converter", "prefetch_depth") == 8
+
+
+def test_interpolation_is_resolved_on_lookup(tmp_path):
+    """Test that a bad % value only fails when it is read, and a valid one is still interpolated."""
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[GENERAL]\n"
+                           "log_level = INFO\n"
+                           "bad = 100%\n"
+                           "level = %(log_level)s\n")
+    config = Config(config_file)
+    assert config.get("GENERAL", "log_level") == "INFO"
+    assert config.get("GENERAL", "level") == "INFO"
+    with pytest.raises(InterpolationSyntaxError):
+        config.get("GENERAL", "bad")
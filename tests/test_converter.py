@@ -1,49 +1,18 @@
 ﻿import pytest
-import json
+import io
 import lxml.etree as et
-from pathlib import Path
+from tests.helpers import load_json, load_test_file
 from src.converter import Converter, EConverterType
 
-
-@pytest.fixture
-def config():
-    """Fixture to create a config instance."""
-    from src.utils import Config
-    return Config(Path("config.ini"))
-
-
-@pytest.fixture
-def logger(config):
-    """Fixture to create a logger instance."""
-    from src.utils import Logger
-    return Logger(config)
-
-
-# helper function to load test files
-def load_test_file(file_name: str) -> Path:
-    """Load a test file and return its content."""
-    return Path(__file__).cwd() / "test_files" / file_name
-
-
-@pytest.fixture
-def xml_converter(logger, config):
-    """Fixture to create a Converter instance for XML."""
-    input_file = load_test_file("test.xml")
-    return Converter(input_file, logger, config)
-
-
-@pytest.fixture
-def geojson_converter(logger, config):
-    """Fixture to create a Converter instance for GeoJSON."""
-    input_file = load_test_file("test.geojson")
-    return Converter(input_file, logger, config)
-
-
-@pytest.fixture
-def kml_converter(logger, config):
-    """Fixture to create a Converter instance for KML."""
-    input_file = load_test_file("test.kml")
-    return Converter(input_file, logger, config)
+# Compiled once instead of re-parsing the namespaced path strings on every lookup
+KML_NS = {"k": "http://www.opengis.net/kml/2.2"}
+_PLACEMARK = et.XPath("//k:Placemark", namespaces=KML_NS)
+_NAME = et.XPath("k:name", namespaces=KML_NS)
+_EXTENDED_DATA = et.XPath("k:ExtendedData", namespaces=KML_NS)
+_DATA = et.XPath("k:Data", namespaces=KML_NS)
+_VALUE = et.XPath("k:value", namespaces=KML_NS)
+_POINT = et.XPath("k:Point", namespaces=KML_NS)
+_COORDINATES = et.XPath("k:coordinates", namespaces=KML_NS)
 
 
 def test_parse_xml(xml_converter):
@@ -83,7 +52,7 @@ def test_parse_kml(kml_converter):
 def test_convert_xml_to_geojson(xml_converter):
     """Test XML to GeoJSON conversion"""
     geojson_str = xml_converter.convert(EConverterType.GEOJSON)
-    geojson = json.loads(geojson_str)
+    geojson = load_json(geojson_str)
 
     assert geojson["type"] == "FeatureCollection"
     assert len(geojson["features"]) == 2
@@ -116,19 +85,20 @@ def test_convert_xml_to_kml(xml_converter):
     kml_str = xml_converter.convert(EConverterType.KML)
     root = et.fromstring(kml_str.encode("utf-8"))
 
-    placemark = root.find(".//{http://www.opengis.net/kml/2.2}Placemark")
-    assert placemark is not None
+    placemarks = _PLACEMARK(root)
+    assert placemarks
+    placemark = placemarks[0]
 
-    name = placemark.find("{http://www.opengis.net/kml/2.2}name")
-    assert name is not None and name.text == "Test Location"
+    name = _NAME(placemark)
+    assert name and name[0].text == "Test Location"
 
-    extended_data = placemark.find("{http://www.opengis.net/kml/2.2}ExtendedData")
-    assert extended_data is not None
+    extended_data = _EXTENDED_DATA(placemark)
+    assert extended_data
 
     # Check metadata in ExtendedData
-    for data in extended_data.findall("{http://www.opengis.net/kml/2.2}Data"):
+    for data in _DATA(extended_data[0]):
         key = data.get("name")
-        value = data.find("{http://www.opengis.net/kml/2.2}value").text
+        value = _VALUE(data)[0].text
 
         if key == "adr":
             assert value == "123 Test Street"
@@ -139,8 +109,73 @@ def test_convert_xml_to_kml(xml_converter):
         elif key == "note":
             assert value == "Test note"
 
-    point = placemark.find("{http://www.opengis.net/kml/2.2}Point")
-    assert point is not None
+    point = _POINT(placemark)
+    assert point
+
+    coordinates = _COORDINATES(point[0])
+    assert coordinates and coordinates[0].text == "-97.123456,30.123456"
+
 
-    coordinates = point.find("{http://www.opengis.net/kml/2.2}coordinates")
-    assert coordinates is not None and coordinates.text == "-97.123456,30.123456"
+def test_parse_coordinate_batch(monkeypatch):
+    """Test that batched coordinate parsing matches the per-marker parser, also on invalid input."""
+    monkeypatch.setattr("src.converter._VECTORIZE_THRESHOLD", 0)
+    coord_texts = ["30.123456, -97.123456", "", "-122.0822035425683,37.42228990140251,0"]
+    expected = [Converter._parse_coordinates(text) for text in coord_texts]
+    assert Converter._parse_coordinate_batch(coord_texts) == expected
+
+    # "#" is no comment, these fail like they do one marker at a time instead of shifting or truncating rows
+    for coord_texts in (["1,2", "#c", "3,4"], ["1,2#3"]):
+        with pytest.raises(ValueError):
+            Converter._parse_coordinate_batch(coord_texts)
+
+
+@pytest.mark.parametrize("new_type", [EConverterType.GEOJSON, EConverterType.KML])
+def test_pretty_output(logger, config, new_type):
+    """Test that output is compact by default and indented with pretty, with the same content."""
+    input_file = load_test_file("test.xml")
+    compact = Converter(input_file, logger, config).convert(new_type)
+    pretty = Converter(input_file, logger, config, pretty=True).convert(new_type)
+
+    assert "\n  " not in compact
+    assert "\n  " in pretty
+    if new_type == EConverterType.GEOJSON:
+        assert load_json(compact) == load_json(pretty)
+    else:
+        parser = et.XMLParser(remove_blank_text=True)
+        assert et.tostring(et.fromstring(compact.encode("utf-8"), parser)) == \
+               et.tostring(et.fromstring(pretty.encode("utf-8"), parser))
+
+
+@pytest.mark.parametrize("source, new_type", [
+    ("test.xml", EConverterType.GEOJSON),
+    ("test.geojson", EConverterType.KML),
+    ("test.kml", EConverterType.XML),
+])
+def test_stream_matches_write(monkeypatch, logger, config, source, new_type):
+    """Test that the fused single-pass conversion writes the same bytes as building the data first."""
+    monkeypatch.setattr("src.converter._STREAM_THRESHOLD", 0)
+    input_file = load_test_file(source)
+
+    streamed, buffered = io.BytesIO(), io.BytesIO()
+    Converter(input_file, logger, config).write(new_type, streamed, stream=True)
+    Converter(input_file, logger, config).write(new_type, buffered)
+
+    assert streamed.getvalue() == buffered.getvalue()
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+def test_xslt_matches_tree(logger, config, pretty):
+    """Test that the KML to XML stylesheet writes the same document as building the data first."""
+    input_file = load_test_file("test.kml")
+    transformed, built = io.BytesIO(), io.BytesIO()
+    Converter(input_file, logger, config, pretty).write(EConverterType.XML, transformed, stream=True)
+    Converter(input_file, logger, config, pretty).write(EConverterType.XML, built)
+    assert transformed.getvalue() == built.getvalue()
+
+
+def test_xslt_only_for_single_conversion(monkeypatch, logger, config):
+    """Test that a KML file converted to more than one format is parsed once, without the stylesheet."""
+    monkeypatch.setattr("src.converter._get_xslt", None)  # calling it fails the test
+    converter = Converter(load_test_file("test.kml"), logger, config)
+    converter.write(EConverterType.XML, io.BytesIO())
+    converter.write(EConverterType.GEOJSON, io.BytesIO())
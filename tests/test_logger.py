@@ -0,0 +1,89 @@
+﻿import logging
+
+import pytest
+from src.utils import Config, Logger
+
+
+@pytest.fixture
+def warning_logger(tmp_path):
+    """Creates a logger that only logs warnings and above."""
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[GENERAL]\n"
+                           "log_level = WARNING\n")
+    return Logger(Config(config_file))
+
+
+def test_disabled_levels_are_skipped(warning_logger):
+    """Test that messages below the configured level are dropped and the rest are formatted lazily."""
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    warning_logger._logger.addHandler(handler)
+    try:
+        warning_logger.info("skipped %s", 1)
+        warning_logger.warning("logged %s", 2)
+    finally:
+        warning_logger._logger.removeHandler(handler)
+
+    assert [record.getMessage() for record in records] == ["logged 2"]
+    assert not warning_logger.is_enabled(logging.INFO)
+    assert warning_logger.is_enabled(logging.ERROR)
+
+
+def test_numeric_log_level_falls_back_to_info(tmp_path):
+    """Test that a log level the config reads back as a number falls back to INFO."""
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[GENERAL]\n"
+                           "log_level = 10\n")
+    logger = Logger(Config(config_file))
+    assert logger.is_enabled(logging.INFO)
+    assert not logger.is_enabled(logging.DEBUG)
+
+
+def test_new_logger_stops_previous_listener(warning_logger, tmp_path):
+    """Test that a second Logger for the same name stops the first one's background thread."""
+    config_file = tmp_path / "config.ini"
+    logger = Logger(Config(config_file))
+    assert warning_logger._listener._thread is None
+    assert logger._listener._thread is not None
+    logger.shutdown()
+    assert logger._listener._thread is None
+
+
+def test_records_render_after_shutdown(tmp_path, capsys):
+    """Test that records logged after shutdown are rendered straight away instead of piling up in the queue."""
+    logger = Logger(Config(tmp_path / "config.ini"))
+    logger.shutdown()
+    logger.info("after shutdown")
+    assert logger._queue_handler.queue.empty()
+    assert "after shutdown" in capsys.readouterr().out
+
+
+def test_record_args_are_formatted_when_logged(tmp_path, capsys):
+    """Test that a record shows its args as they were when logged, not when the listener renders it."""
+    logger = Logger(Config(tmp_path / "config.ini"))
+    values = [1]
+    logger.info("values %s", values)
+    values.append(2)
+    logger.shutdown()
+    assert "values [1]" in capsys.readouterr().out
+
+
+def test_print_json_keeps_explicit_data(tmp_path, capsys):
+    """Test that print_json prints data passed by keyword, as well as objects and strings passed positionally."""
+    logger = Logger(Config(tmp_path / "config.ini"))
+    logger.print_json(None, data={"a": 1})
+    logger.print_json({"b": 2})
+    logger.print_json('{"c": 3}')
+    out = capsys.readouterr().out
+    assert '"a": 1' in out and '"b": 2' in out and '"c": 3' in out
+    assert "null" not in out
+
+
+def test_is_enabled_follows_later_loggers(warning_logger, tmp_path):
+    """Test that is_enabled follows the shared stdlib logger when another Logger changes its level."""
+    config_file = tmp_path / "debug.ini"
+    config_file.write_text("[GENERAL]\n"
+                           "log_level = DEBUG\n")
+    Logger(Config(config_file))
+    assert warning_logger.is_enabled(logging.DEBUG)
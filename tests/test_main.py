@@ -1,17 +1,19 @@
 ﻿import pytest
-import json
 import lxml.etree as et
 from argparse import Namespace
-from main import Main
+from tests.helpers import dump_json, load_json
+from main import Main, _find_files, _group_by_output
 from src.converter import EConverterType
 
 
 # 🔹 Helper function to create a test directory with sample files
-@pytest.fixture
-def setup_test_directory(tmp_path):
-    """Creates a temporary directory with sample XML, KML, and GeoJSON files."""
-    test_dir = tmp_path / "batch_test"
-    test_dir.mkdir()
+@pytest.fixture(scope="session")
+def setup_test_directory(tmp_path_factory):
+    """Creates a temporary directory with sample XML, KML, and GeoJSON files, shared by the whole session.
+
+    Tests only read from it; each one writes its output into its own tmp_path.
+    """
+    test_dir = tmp_path_factory.mktemp("batch_test")
 
     # Create subdirectories
     subdir = test_dir / "nested"
@@ -32,7 +34,7 @@ def setup_test_directory(tmp_path):
     (test_dir / "test.xml").write_text(xml_content)
 
     # Sample GeoJSON file
-    geojson_content = json.dumps({
+    geojson_content = dump_json({
         "type": "FeatureCollection",
         "features": [
             {
@@ -50,8 +52,8 @@ def setup_test_directory(tmp_path):
                 }
             }
         ]
-    }, indent=2)
-    (subdir / "test.geojson").write_text(geojson_content)
+    })
+    (subdir / "test.geojson").write_bytes(geojson_content)
 
     return test_dir
 
@@ -80,7 +82,8 @@ def test_cli_argument_parsing(tmp_path):
     assert set(main.target_types) == {EConverterType.XML, EConverterType.GEOJSON, EConverterType.KML}
 
 
-def test_batch_processing(setup_test_directory, tmp_path):
+@pytest.mark.parametrize("jobs", [1, None])  # in-process and through the worker pool
+def test_batch_processing(setup_test_directory, tmp_path, jobs):
     """Tests batch processing by converting multiple files, including those in subdirectories."""
     output_dir = tmp_path / "output"
     output_dir.mkdir()
@@ -90,7 +93,8 @@ def test_batch_processing(setup_test_directory, tmp_path):
         output=str(output_dir),
         xml=True,
         geojson=True,
-        kml=True
+        kml=True,
+        jobs=jobs
     )
 
     main = Main(args)
@@ -104,7 +108,7 @@ def test_batch_processing(setup_test_directory, tmp_path):
     assert (output_dir / "nested/test.kml").exists()
 
     # Validate JSON Output
-    geojson_data = json.loads((output_dir / "test.geojson").read_text())
+    geojson_data = load_json((output_dir / "test.geojson").read_bytes())
     assert geojson_data["type"] == "FeatureCollection"
     assert len(geojson_data["features"]) == 1
 
@@ -125,3 +129,51 @@ def test_no_input_file():
 
     with pytest.raises(ValueError, match="No valid files found for conversion."):
         Main(args)
+
+
+def test_group_by_output(tmp_path):
+    """Test that files writing the same output path are grouped in order, and unrelated files are not."""
+    files = [tmp_path / "a.kml", tmp_path / "a.xml", tmp_path / "a.geojson", tmp_path / "nested" / "a.kml"]
+    types = [EConverterType.XML, EConverterType.GEOJSON, EConverterType.KML]
+
+    assert _group_by_output(files, types, tmp_path / "out", tmp_path, True) == [files[:3], files[3:]]
+    # a.geojson is already GeoJSON, so without copying originals it writes nothing
+    assert _group_by_output(files, [EConverterType.GEOJSON], tmp_path / "out", tmp_path, False) == \
+           [files[:2], files[2:3], files[3:]]
+
+
+def test_failed_conversion_writes_nothing(tmp_path):
+    """Test that a file failing to convert leaves no partial output behind."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "a.xml").write_text("<markers><marker><geo>1.0, 2.0</geo></marker></markers>")  # no <name>
+    output_dir = tmp_path / "output"
+
+    args = Namespace(input=str(input_dir), output=str(output_dir), xml=False, geojson=False, kml=True, jobs=1)
+    with pytest.raises(KeyError):
+        Main(args).run()
+
+    assert list(output_dir.iterdir()) == []
+
+
+def test_single_group_runs_in_process(monkeypatch, tmp_path):
+    """Test that a run with nothing to spread over workers converts in this process instead of starting a pool."""
+    monkeypatch.setattr("main.ProcessPoolExecutor", None)  # starting a pool fails the test
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "a.xml").write_text("<markers><marker><name>a</name><geo>1.0, 2.0</geo></marker></markers>")
+    output_dir = tmp_path / "output"
+
+    args = Namespace(input=str(input_dir), output=str(output_dir), xml=False, geojson=True, kml=False, jobs=4)
+    Main(args).run()
+
+    assert load_json((output_dir / "a.geojson").read_bytes())["features"][0]["properties"]["name"] == "a"
+
+
+def test_find_files_is_sorted(tmp_path):
+    """Test that input files come back sorted by path, whatever order the filesystem lists them in."""
+    for name in ("b/c.kml", "a.xml", "b.geojson", "b/a.xml", "c.txt"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text("")
+    assert _find_files(tmp_path) == [tmp_path / "a.xml", tmp_path / "b" / "a.xml", tmp_path / "b" / "c.kml",
+                                     tmp_path / "b.geojson"]